@@ -2,51 +2,57 @@
 
 import csv
 import os
+from collections import Counter
 
 
 def describe(filepath: str):
     """Print row count, column count, and key distributions for a CSV."""
+    year_counts = Counter()
+    fmt_counts = Counter()
+    loc_counts = Counter()
+    n_rows = 0
+
     with open(filepath, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
-        rows = list(reader)
-        columns = reader.fieldnames
+        columns = reader.fieldnames or []
+        has_year = 'year' in columns
+        has_format = 'format' in columns
+        has_location = 'location' in columns
+
+        # Single streaming pass; rows are never held in memory
+        for r in reader:
+            n_rows += 1
+            if has_year:
+                year_counts[r['year']] += 1
+            if has_format:
+                fmt_counts[r['format']] += 1
+            if has_location:
+                loc_counts[r['location']] += 1
 
     print(f"*  File: {os.path.basename(filepath)}")
-    print(f"*  Rows: {len(rows)}")
+    print(f"*  Rows: {n_rows}")
     print(f"*  Columns: {len(columns)}")
     print(f"*  Column names: {', '.join(columns)}")
     print()
 
     # Events per year
-    if 'year' in columns:
-        year_counts = {}
-        for r in rows:
-            y = r['year']
-            year_counts[y] = year_counts.get(y, 0) + 1
+    if has_year:
         print("*  Events per year:")
         for y in sorted(year_counts.keys()):
             print(f"*    {y}: {year_counts[y]}")
         print()
 
     # Format distribution
-    if 'format' in columns:
-        fmt_counts = {}
-        for r in rows:
-            f = r['format']
-            fmt_counts[f] = fmt_counts.get(f, 0) + 1
+    if has_format:
         print("*  Format distribution:")
-        for f, c in sorted(fmt_counts.items(), key=lambda x: -x[1]):
+        for f, c in fmt_counts.most_common():
             print(f"*    {f}: {c}")
         print()
 
     # Location distribution
-    if 'location' in columns:
-        loc_counts = {}
-        for r in rows:
-            l = r['location']
-            loc_counts[l] = loc_counts.get(l, 0) + 1
+    if has_location:
         print("*  Location distribution:")
-        for l, c in sorted(loc_counts.items(), key=lambda x: -x[1]):
+        for l, c in loc_counts.most_common():
             print(f"*    {l}: {c}")
         print()
 
@@ -1,20 +1,95 @@
 """Enriches raw CTFtime CSV data with derived temporal and event variables."""
 
 import csv
+import io
 import sys
 import re
 from datetime import datetime
-from dateutil import parser as dateparser
 import argparse
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 
 
 class CTFDataEnricher:
     """Adds temporal, categorical, and event characteristic columns to CTF data."""
 
+    # One side of a CTFtime date range, e.g. "27 Dec., 12:00 PST" or
+    # "29 Dec. 2015, 12:00 PST". Groups: day, month, year, hour, minute, tz.
+    # AM/PM is not a timezone; 12-hour times are left to the fallback parser.
+    DATE_RE = re.compile(
+        r'(\d{1,2})\s+([A-Z][a-z]{2,8})\.?(?:\s+(\d{4}))?,'
+        r'\s+(\d{1,2}):(\d{2})\s+(?!AM\b|PM\b)([A-Z]{2,4})'
+    )
+
+    # Keyed by the first three letters so "Sept", "June", "April" etc. resolve
+    MONTHS = {
+        'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+        'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
+    }
+
+    # Layouts tried with strptime (after NOISE_RE cleanup) when DATE_RE misses
+    STRPTIME_FORMATS = (
+        '%d %b %H:%M %Y', '%d %B %H:%M %Y',
+        '%d %b %Y %H:%M', '%d %B %Y %H:%M',
+        '%d %b %I:%M %p %Y', '%d %B %I:%M %p %Y',
+        '%d %b %Y %I:%M %p', '%d %B %Y %I:%M %p',
+        '%d %b %Y', '%d %B %Y'
+    )
+
+    # Timezone abbreviations and punctuation strptime cannot handle; AM/PM
+    # markers are kept so the %p formats read 12-hour clocks correctly
+    NOISE_RE = re.compile(r'\b(?!AM\b|PM\b)[A-Z]{2,5}\b|[.,]')
+
+    # Separator between the start and end of a date range
+    SPLIT_RE = re.compile(r'\s*[—–-]\s*')
+
+    # Indexed by month - 1
+    QUARTERS = ('Q1', 'Q1', 'Q1', 'Q2', 'Q2', 'Q2',
+                'Q3', 'Q3', 'Q3', 'Q4', 'Q4', 'Q4')
+    SEASONS = ('Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer',
+               'Summer', 'Summer', 'Fall', 'Fall', 'Fall', 'Winter')
+
+    # Indexed by datetime.weekday(); avoids locale-dependent strftime('%A')
+    DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday',
+            'Friday', 'Saturday', 'Sunday')
+
+    # COVID era boundaries as year * 12 + month keys (March 2020, January 2022)
+    COVID_START = 2020 * 12 + 3
+    POST_COVID_START = 2022 * 12 + 1
+
+    # Raw -> standardized values; unknown locations pass through unchanged,
+    # unknown formats become "Other"
+    LOCATIONS = {
+        'On-line': 'Online', 'Online': 'Online',
+        'In-person': 'On-site', 'On-site': 'On-site',
+        'Hybrid': 'Hybrid'
+    }
+    FORMATS = {
+        'Hack-Quest': 'Jeopardy', 'Jeopardy': 'Jeopardy',
+        'Attack-Defense': 'Attack-Defense', 'Hybrid': 'Hybrid',
+        'King-of-the-Hill': 'King-of-the-Hill'
+    }
+
+    # Output column order written by save_to_csv
+    FIELDNAMES = (
+        'event_id', 'name', 'year',
+        'start_date', 'end_date', 'start_datetime', 'end_datetime',
+        'duration_hours', 'duration_days', 'start_month', 'start_quarter',
+        'start_day_of_week', 'is_weekend', 'season', 'covid_era',
+        'format', 'location', 'weight',
+        'is_multi_day', 'duration_category', 'weight_category',
+        'is_qualifier', 'is_finals', 'is_prequalified',
+        'year_index', 'event_sequence_in_year',
+        'date_raw', 'notes'
+    )
+
     def __init__(self):
         self.parse_failures = []
         self.duration_outliers = []
+        # Rounds of the same event often share a date string; the returned
+        # datetimes are immutable, so repeats can reuse the first parse
+        self._parse_date_cached = lru_cache(maxsize=4096)(self.parse_ctftime_date)
 
     def parse_ctftime_date(self, date_str: str, year: int) -> tuple:
         """
@@ -29,43 +104,87 @@ class CTFDataEnricher:
             return None, None
 
         try:
-            parts = re.split(r'\s*[—–-]\s*', date_str)
+            parts = self.SPLIT_RE.split(date_str)
             if len(parts) != 2:
                 return None, None
 
             start_str, end_str = parts
 
-            # Add year if not present
-            if str(year) not in start_str:
-                start_str = f"{start_str} {year}"
+            start_match = self.DATE_RE.fullmatch(start_str.strip())
+            end_match = self.DATE_RE.fullmatch(end_str.strip())
+            if start_match is None or end_match is None:
+                return self._parse_fuzzy(start_str, end_str, year)
 
-            start_dt = dateparser.parse(start_str, fuzzy=True)
-            if start_dt and start_dt.tzinfo is not None:
-                start_dt = start_dt.replace(tzinfo=None)
+            start_dt = self._match_to_datetime(start_match, year)
 
             # Handle cross-year events (e.g. Dec start, Jan end)
-            if str(year) not in end_str and str(year + 1) not in end_str:
-                if 'jan' in end_str.lower() and start_dt and start_dt.month == 12:
-                    end_str = f"{end_str} {year + 1}"
-                else:
-                    end_str = f"{end_str} {year}"
-
-            end_dt = dateparser.parse(end_str, fuzzy=True)
-            if end_dt and end_dt.tzinfo is not None:
-                end_dt = end_dt.replace(tzinfo=None)
+            end_year = year
+            if end_match.group(3) is None and end_match.group(2)[:3] == 'Jan' \
+                    and start_dt.month == 12:
+                end_year = year + 1
+            end_dt = self._match_to_datetime(end_match, end_year)
 
             # Sanity check
-            if start_dt and end_dt and end_dt < start_dt:
-                end_dt = dateparser.parse(
-                    f"{end_str.split()[0]} {end_str.split()[1]} {year + 1}",
-                    fuzzy=True
-                )
+            if end_dt < start_dt:
+                end_dt = end_dt.replace(year=year + 1, hour=0, minute=0)
 
             return start_dt, end_dt
 
         except Exception:
             return None, None
 
+    def _match_to_datetime(self, match: re.Match, year: int) -> datetime:
+        """Build a naive datetime from a DATE_RE match; the timezone is dropped."""
+        day, month, explicit_year, hour, minute, _tz = match.groups()
+        return datetime(
+            int(explicit_year) if explicit_year else year,
+            self.MONTHS[month[:3]], int(day), int(hour), int(minute)
+        )
+
+    def _parse_side(self, text: str) -> datetime:
+        """
+        Parse one side of a date range that DATE_RE did not match.
+        Tries the known STRPTIME_FORMATS first and only falls back to
+        dateutil's fuzzy parser (imported on demand) if none of them fit.
+        """
+        cleaned = ' '.join(self.NOISE_RE.sub(' ', text).split())
+        for fmt in self.STRPTIME_FORMATS:
+            try:
+                return datetime.strptime(cleaned, fmt)
+            except ValueError:
+                continue
+
+        from dateutil import parser as dateparser
+        dt = dateparser.parse(text, fuzzy=True)
+        if dt and dt.tzinfo is not None:
+            dt = dt.replace(tzinfo=None)
+        return dt
+
+    def _parse_fuzzy(self, start_str: str, end_str: str, year: int) -> tuple:
+        """Fallback for date strings DATE_RE does not recognize."""
+        # Add year if not present
+        if str(year) not in start_str:
+            start_str = f"{start_str} {year}"
+
+        start_dt = self._parse_side(start_str)
+
+        # Handle cross-year events (e.g. Dec start, Jan end)
+        if str(year) not in end_str and str(year + 1) not in end_str:
+            if 'jan' in end_str.lower() and start_dt and start_dt.month == 12:
+                end_str = f"{end_str} {year + 1}"
+            else:
+                end_str = f"{end_str} {year}"
+
+        end_dt = self._parse_side(end_str)
+
+        # Sanity check
+        if start_dt and end_dt and end_dt < start_dt:
+            end_dt = self._parse_side(
+                f"{end_str.split()[0]} {end_str.split()[1]} {year + 1}"
+            )
+
+        return start_dt, end_dt
+
     def get_duration_hours(self, start_dt: datetime, end_dt: datetime) -> float:
         """Calculate duration in hours. Returns None for invalid results."""
         if start_dt and end_dt:
@@ -77,17 +196,11 @@ class CTFDataEnricher:
 
     def get_quarter(self, month: int) -> str:
         """Map month (1-12) to quarter string (Q1-Q4)."""
-        return f"Q{(month - 1) // 3 + 1}"
+        return self.QUARTERS[month - 1]
 
     def get_season(self, month: int) -> str:
         """Map month to meteorological season (Northern Hemisphere)."""
-        seasons = {
-            12: "Winter", 1: "Winter", 2: "Winter",
-            3: "Spring", 4: "Spring", 5: "Spring",
-            6: "Summer", 7: "Summer", 8: "Summer",
-            9: "Fall", 10: "Fall", 11: "Fall"
-        }
-        return seasons.get(month)
+        return self.SEASONS[month - 1]
 
     def get_covid_era(self, year: int, month: int) -> str:
         """
@@ -96,9 +209,11 @@ class CTFDataEnricher:
             COVID:      March 2020 through December 2021
             Post-COVID: January 2022 onward
         """
-        if year < 2020 or (year == 2020 and month < 3):
+        # Compare a single year * 12 + month key against the era boundaries
+        key = year * 12 + month
+        if key < self.COVID_START:
             return "Pre-COVID"
-        elif year <= 2021:
+        elif key < self.POST_COVID_START:
             return "COVID"
         return "Post-COVID"
 
@@ -124,38 +239,42 @@ class CTFDataEnricher:
 
     def standardize_location(self, location_raw: str) -> str:
         """Normalize location to Online or On-site."""
-        if location_raw in ('On-line', 'Online'):
-            return "Online"
-        elif location_raw in ('In-person', 'On-site'):
-            return "On-site"
-        elif location_raw == 'Hybrid':
-            return "Hybrid"
-        return location_raw
+        return self.LOCATIONS.get(location_raw, location_raw)
 
     def standardize_format(self, format_raw: str) -> str:
         """Normalize format values. Hack-Quest is grouped with Jeopardy."""
-        if format_raw == 'Hack-Quest':
-            return "Jeopardy"
-        elif format_raw in ('Jeopardy', 'Attack-Defense', 'Hybrid', 'King-of-the-Hill'):
-            return format_raw
-        return "Other"
+        return self.FORMATS.get(format_raw, "Other")
 
     def enrich_event(self, event: dict, event_sequence: int) -> dict:
         """Add all derived columns to a single event."""
-        enriched = event.copy()
-
         year = int(event.get('year', 0))
         date_raw = event.get('date_raw', '')
         name = event.get('name', '')
         weight = float(event.get('weight', 0))
         notes = event.get('notes', '')
 
-        # Standardize
-        enriched['location'] = self.standardize_location(event.get('location', ''))
-        enriched['format'] = self.standardize_format(event.get('format', ''))
+        # Name and notes flags; each string is lowercased once
+        name_lc = name.lower()
+        notes_lc = notes.lower() if notes != 'N/A' else ''
+        is_qualifier = 1 if 'qual' in name_lc or 'prelim' in name_lc else 0
+        is_finals = 1 if 'final' in name_lc else 0
+        is_prequalified = 1 if 'prequalified' in notes_lc else 0
+
+        # Only the input columns save_to_csv writes are carried over,
+        # standardizing location and format on the way
+        enriched = {
+            'event_id': event.get('event_id'),
+            'name': name,
+            'year': event.get('year'),
+            'format': self.standardize_format(event.get('format', '')),
+            'location': self.standardize_location(event.get('location', '')),
+            'weight': event.get('weight'),
+            'date_raw': date_raw,
+            'notes': notes
+        }
 
         # Parse dates
-        start_dt, end_dt = self.parse_ctftime_date(date_raw, year)
+        start_dt, end_dt = self._parse_date_cached(date_raw, year)
 
         if start_dt is None or end_dt is None:
             self.parse_failures.append({
@@ -175,9 +294,9 @@ class CTFDataEnricher:
                 'is_multi_day': None,
                 'duration_category': None,
                 'weight_category': self.get_weight_category(weight),
-                'is_qualifier': 1 if any(t in name.lower() for t in ['qual', 'prelim']) else 0,
-                'is_finals': 1 if 'final' in name.lower() else 0,
-                'is_prequalified': 1 if 'prequalified' in notes.lower() else 0,
+                'is_qualifier': is_qualifier,
+                'is_finals': is_finals,
+                'is_prequalified': is_prequalified,
                 'year_index': year - 2015,
                 'event_sequence_in_year': event_sequence
             })
@@ -195,49 +314,56 @@ class CTFDataEnricher:
                 'duration_hours': duration_hours
             })
 
+        # Format each datetime once and slice out the date part
+        start_iso = start_dt.isoformat(sep=' ')
+        end_iso = end_dt.isoformat(sep=' ')
+        weekday = start_dt.weekday()
+
         enriched.update({
-            'start_date': start_dt.strftime('%Y-%m-%d'),
-            'end_date': end_dt.strftime('%Y-%m-%d'),
-            'start_datetime': start_dt.strftime('%Y-%m-%d %H:%M:%S'),
-            'end_datetime': end_dt.strftime('%Y-%m-%d %H:%M:%S'),
+            'start_date': start_iso[:10],
+            'end_date': end_iso[:10],
+            'start_datetime': start_iso[:19],
+            'end_datetime': end_iso[:19],
             'duration_hours': duration_hours,
             'duration_days': duration_days,
             'start_month': start_dt.month,
             'start_quarter': self.get_quarter(start_dt.month),
-            'start_day_of_week': start_dt.strftime('%A'),
-            'is_weekend': 1 if start_dt.weekday() >= 4 else 0,
+            'start_day_of_week': self.DAYS[weekday],
+            'is_weekend': 1 if weekday >= 4 else 0,
             'season': self.get_season(start_dt.month),
             'covid_era': self.get_covid_era(year, start_dt.month),
             'is_multi_day': 1 if duration_hours and duration_hours > 24 else 0,
             'duration_category': self.get_duration_category(duration_hours),
             'weight_category': self.get_weight_category(weight),
-            'is_qualifier': 1 if any(t in name.lower() for t in ['qual', 'prelim']) else 0,
-            'is_finals': 1 if 'final' in name.lower() else 0,
-            'is_prequalified': 1 if notes != 'N/A' and 'prequalified' in notes.lower() else 0,
+            'is_qualifier': is_qualifier,
+            'is_finals': is_finals,
+            'is_prequalified': is_prequalified,
             'year_index': year - 2015,
             'event_sequence_in_year': event_sequence
         })
 
         return enriched
 
-    def enrich_dataset(self, input_file: str) -> list:
-        """Read a CSV file and enrich all events."""
-        events = []
-        year_sequences = {}
+    def iter_enriched(self, input_file: str):
+        """Lazily read a CSV file and yield each event as it is enriched."""
+        enrich_event = self.enrich_event
+        year_sequences = defaultdict(int)
 
         try:
             with open(input_file, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
                 for row in reader:
                     year = int(row.get('year', 0))
-                    year_sequences[year] = year_sequences.get(year, 0) + 1
-                    events.append(self.enrich_event(row, year_sequences[year]))
+                    year_sequences[year] += 1
+                    yield enrich_event(row, year_sequences[year])
 
         except FileNotFoundError:
             print(f"*  Error: File '{input_file}' not found")
             sys.exit(1)
 
-        return events
+    def enrich_dataset(self, input_file: str) -> list:
+        """Read a CSV file and enrich all events."""
+        return list(self.iter_enriched(input_file))
 
     def save_to_csv(self, events: list, output_file: str):
         """Write enriched events to CSV with organized column order."""
@@ -245,22 +371,16 @@ class CTFDataEnricher:
             print("*  No events to save.")
             return
 
-        fieldnames = [
-            'event_id', 'name', 'year',
-            'start_date', 'end_date', 'start_datetime', 'end_datetime',
-            'duration_hours', 'duration_days', 'start_month', 'start_quarter',
-            'start_day_of_week', 'is_weekend', 'season', 'covid_era',
-            'format', 'location', 'weight',
-            'is_multi_day', 'duration_category', 'weight_category',
-            'is_qualifier', 'is_finals', 'is_prequalified',
-            'year_index', 'event_sequence_in_year',
-            'date_raw', 'notes'
-        ]
+        fieldnames = self.FIELDNAMES
+
+        # Render the whole CSV in memory and write it out in one call
+        buf = io.StringIO(newline='')
+        writer = csv.writer(buf)
+        writer.writerow(fieldnames)
+        writer.writerows([[e.get(k) for k in fieldnames] for e in events])
 
         with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
-            writer.writerows(events)
+            f.write(buf.getvalue())
 
         print(f"*  Saved {len(events)} enriched events to '{output_file}'")
 
@@ -1,8 +1,10 @@
 """Parses raw CTFtime tab-separated text files into structured CSV format."""
 
 import csv
+import io
 import sys
 import argparse
+from collections import Counter
 from pathlib import Path
 
 
@@ -64,14 +66,16 @@ class CTFParser:
         Parse a single tab-separated line into an event dictionary.
         Expected column order: Name, Date, Format, Location, Weight, Notes.
         """
-        columns = line.split('\t')
+        # Anything past the sixth tab is ignored, so stop splitting there
+        columns = line.split('\t', 6)
+        if len(columns) < 6:
+            columns.extend([""] * (6 - len(columns)))
+        name, date_raw, format_raw, location_raw, weight_raw, notes_raw = columns[:6]
 
-        name = columns[0].strip() if len(columns) > 0 else ""
-        date_raw = columns[1].strip() if len(columns) > 1 else ""
-        format_raw = columns[2].strip() if len(columns) > 2 else ""
-        location_raw = columns[3].strip() if len(columns) > 3 else ""
-        weight_raw = columns[4].strip() if len(columns) > 4 else ""
-        notes_raw = columns[5].strip() if len(columns) > 5 else ""
+        # Format, location and weight are stripped by their standardize helpers
+        name = name.strip()
+        date_raw = date_raw.strip()
+        notes_raw = notes_raw.strip()
 
         event = {
             'event_id': self.event_counter,
@@ -92,16 +96,21 @@ class CTFParser:
         events = []
 
         try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    if not line.strip():
-                        continue
-                    try:
-                        event = self.parse_line(line)
-                        events.append(event)
-                    except Exception as e:
-                        print(f"*  Warning: Error parsing line {line_num}: {e}")
-                        continue
+            # Split only on \n, \r and \r\n like text-mode iteration does;
+            # str.splitlines() would also break on \f, U+2028 etc.
+            with open(input_file, 'rb') as f:
+                lines = io.StringIO(f.read().decode('utf-8'), newline=None)
+
+            for line_num, line in enumerate(lines, 1):
+                # Same test as "not line.strip()" without building a copy
+                if not line or line.isspace():
+                    continue
+                try:
+                    event = self.parse_line(line)
+                    events.append(event)
+                except Exception as e:
+                    print(f"*  Warning: Error parsing line {line_num}: {e}")
+                    continue
 
         except FileNotFoundError:
             print(f"*  Error: File '{input_file}' not found")
@@ -118,10 +127,14 @@ class CTFParser:
         fieldnames = ['event_id', 'name', 'year', 'date_raw',
                       'format', 'location', 'weight', 'notes']
 
+        # Render the whole CSV in memory and write it out in one call
+        buf = io.StringIO(newline='')
+        writer = csv.DictWriter(buf, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(events)
+
         with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(events)
+            f.write(buf.getvalue())
 
         print(f"*  Saved {len(events)} events to '{output_file}'")
 
@@ -138,24 +151,18 @@ class CTFParser:
         # Format distribution
         print("*")
         print("*  Format distribution:")
-        format_counts = {}
-        for event in events:
-            fmt = event['format']
-            format_counts[fmt] = format_counts.get(fmt, 0) + 1
+        format_counts = Counter(e['format'] for e in events)
 
-        for fmt, count in sorted(format_counts.items(), key=lambda x: x[1], reverse=True):
+        for fmt, count in format_counts.most_common():
             pct = (count / len(events)) * 100
             print(f"*    {fmt}: {count} ({pct:.1f}%)")
 
         # Location distribution
         print("*")
         print("*  Location distribution:")
-        location_counts = {}
-        for event in events:
-            loc = event['location']
-            location_counts[loc] = location_counts.get(loc, 0) + 1
+        location_counts = Counter(e['location'] for e in events)
 
-        for loc, count in sorted(location_counts.items(), key=lambda x: x[1], reverse=True):
+        for loc, count in location_counts.most_common():
             pct = (count / len(events)) * 100
             print(f"*    {loc}: {count} ({pct:.1f}%)")
 
@@ -174,14 +181,23 @@ class CTFParser:
             if len(review_items) > 5:
                 print(f"*    ... and {len(review_items) - 5} more")
 
-        # Weight stats
-        weights = [float(e['weight']) for e in events if e['weight'] != '0']
-        if weights:
+        # Weight stats, accumulated in a single pass
+        w_count = 0
+        w_sum = 0.0
+        w_max = 0.0
+        for event in events:
+            if event['weight'] != '0':
+                w = float(event['weight'])
+                w_count += 1
+                w_sum += w
+                if w_count == 1 or w > w_max:
+                    w_max = w
+        if w_count:
             print("*")
             print(f"*  Weight stats:")
-            print(f"*    Events with weight > 0: {len(weights)}/{len(events)}")
-            print(f"*    Average: {sum(weights) / len(weights):.2f}")
-            print(f"*    Max: {max(weights):.2f}")
+            print(f"*    Events with weight > 0: {w_count}/{len(events)}")
+            print(f"*    Average: {w_sum / w_count:.2f}")
+            print(f"*    Max: {w_max:.2f}")
 
 
 def main():